@@ -1,6 +1,4 @@
-from collections import OrderedDict
 import random
-import re
 from pygame import Rect
 import pygame
 import numpy as np
@@ -8,8 +6,20 @@ import numpy as np
 WINDOW_WIDTH, WINDOW_HEIGHT = 500, 601
 GRID_WIDTH, GRID_HEIGHT = 300, 600
 TILE_SIZE = 30
+GRID_COLS, GRID_ROWS = GRID_WIDTH // TILE_SIZE, GRID_HEIGHT // TILE_SIZE
 LEVEL_SPEEDS = [800, 600, 450, 300, 200]  # Speeds for each level
 LINES_PER_LEVEL = 10
+# Offsets tried, in order, to fit a rotated block.
+WALL_KICKS = ((0, 0), (-1, 0), (1, 0), (0, -1), (-2, 0), (2, 0))
+# Block method to call for each movement key.
+MOVE_METHODS = {
+    pygame.K_DOWN: "move_down",
+    pygame.K_LEFT: "move_left",
+    pygame.K_RIGHT: "move_right"
+}
+
+# Rendered block images keyed by block color and structure.
+_BLOCK_SURFACE_CACHE = {}
 
 class BottomReached(Exception):
     """Exception raised when a block reaches the bottom."""
@@ -34,19 +44,14 @@ class Block(pygame.sprite.Sprite):
         "ReverseZBlock": (0, 255, 0)   # Green
     }
 
-    @staticmethod
-    def collide(block, group):
+    def __init_subclass__(cls, **kwargs):
         """
-        Check if the specified block collides with some other block
-        in the group.
+        Turn the structure of each block type into a read-only array
+        shared by all the blocks of that type.
         """
-        for other_block in group:
-            # Ignore the current block which will always collide with itself.
-            if block == other_block:
-                continue
-            if pygame.sprite.collide_mask(block, other_block) is not None:
-                return True
-        return False
+        super().__init_subclass__(**kwargs)
+        cls.struct = np.array(cls.struct, dtype=np.uint8)
+        cls.struct.setflags(write=False)
 
     def __init__(self):
         """
@@ -54,24 +59,45 @@ class Block(pygame.sprite.Sprite):
         """
         super().__init__()
         self.current = True
-        self.struct = np.array(self.struct)
 
         # Get the color associated with the block type
-        class_name = re.search(r"<class '__main__\.([^']+)'>", str(type(self))).group(1)
-        self.color = Block.COLORS[class_name]
-
-        # Initial random rotation and flip.
-        if random.randint(0, 1):
-            self.struct = np.rot90(self.struct)
-        if random.randint(0, 1):
-            # Flip in the X axis.
-            self.struct = np.flip(self.struct, 0)
+        self.color = Block.COLORS[type(self).__name__]
+
+        # Initial random rotation and flip (in the X axis). Flipping a
+        # rotated structure is the same as rotating the flipped one the
+        # other way, so keep track of the flip and the quarter turns
+        # applied after it.
+        rotation = random.randint(0, 1)
+        self._flip = random.randint(0, 1)
+        self._rotation = -rotation % 4 if self._flip else rotation
+        self.struct = _ROTATION_CACHE[(type(self).__name__, self._flip, self._rotation)]
         self._draw()
 
     def _draw(self, x=4, y=0):
         """
         Draw the block's structure on the image surface.
         """
+        self._render()
+        self._update_struct_info()
+
+        # Set the position and size
+        self.rect = self._create_rect(0, 0, self.image.get_width(),
+                                      self.image.get_height())
+        self.x = x
+        self.y = y
+
+    def _render(self):
+        """
+        Set the image of the block's structure. Blocks with the same
+        color and structure share it, so it is only drawn the first time
+        that structure shows up.
+        """
+        key = (self.color, self.struct.shape, self.struct.tobytes())
+        cached = _BLOCK_SURFACE_CACHE.get(key)
+        if cached is not None:
+            self.image = cached
+            return
+
         # Calculate the width and height based on the structure
         width = len(self.struct[0]) * TILE_SIZE
         height = len(self.struct) * TILE_SIZE
@@ -80,39 +106,64 @@ class Block(pygame.sprite.Sprite):
         self.image = pygame.surface.Surface([width, height])
         self.image.set_colorkey((0, 0, 0))
 
-        # Set the position and size
-        self.rect = self._create_rect(0, 0, width, height)
-        self.x = x
-        self.y = y
-
         # Draw the structure on the image
         for y, row in enumerate(self.struct):
             for x, col in enumerate(row):
                 if col:
-                    rect = self._create_rect(x*TILE_SIZE + 1, y*TILE_SIZE + 1,
-                                            TILE_SIZE - 2, TILE_SIZE - 2)
-                    pygame.draw.rect(self.image, self.color, rect)
-
-        # Create a mask for the image
-        self._create_mask()
+                    # A plain tuple saves creating a Rect for each tile.
+                    pygame.draw.rect(self.image, self.color,
+                                     (x*TILE_SIZE + 1, y*TILE_SIZE + 1,
+                                      TILE_SIZE - 2, TILE_SIZE - 2))
+
+        # Match the display's pixel format so blitting doesn't need to
+        # convert it every frame. This needs the display to be set up, so
+        # until then the surface is neither converted nor cached, and it
+        # gets converted the first time it's drawn afterwards.
+        if pygame.display.get_surface() is not None:
+            self.image = self.image.convert()
+            _BLOCK_SURFACE_CACHE[key] = self.image
+
+    def _update_struct_info(self):
+        """
+        Update the values derived from the structure. This should be
+        called whenever the structure changes.
+        """
+        # (y_offset, x_offset) of each occupied cell of the structure.
+        self._cells = np.argwhere(self.struct)
+        # Bit mask of each row.
+        self._rows = tuple(Block._row_masks(self.struct))
+        # Size of the structure, in tiles.
+        self._h, self._w = self.struct.shape
 
     def _create_rect(self, x, y, width, height):
         return Rect(x, y, width, height)
 
+    def remove_rows(self, y_offsets):
+        """
+        Remove the rows at y_offsets from the block's structure and
+        redraw it at the same position. Return whether the block has any
+        tiles left; if it doesn't, it is not redrawn.
+        """
+        self.struct = np.delete(self.struct, y_offsets, 0)
+        # The block no longer matches any of its rotations.
+        self._rotation = None
+        if not self.struct.any():
+            return False
+        # Once removed, check if we have empty columns since they need
+        # to be dropped.
+        self.struct, x_offset = del_empty_columns(self.struct)
+        # Compensate the space gone with the columns to keep the
+        # block's original position.
+        self.x += x_offset
+        self.redraw()
+        return True
+
     def redraw(self):
         """
         Redraw the block at its current position.
         """
         self._draw(self.x, self.y)
 
-    def _create_mask(self):
-        """
-        Create the mask attribute from the main surface.
-        The mask is required to check collisions. This should be called
-        after the surface is created or updated.
-        """
-        self.mask = pygame.mask.from_surface(self.image)
-
     @property
     def group(self):
         """
@@ -150,67 +201,121 @@ class Block(pygame.sprite.Sprite):
         self._y = value
         self.rect.top = value*TILE_SIZE
 
+    @staticmethod
+    def _row_masks(struct):
+        """
+        Get the bit mask of each row of the structure (bit c is set if
+        column c is occupied). Shift them by x to place them on a row
+        of the bitboard.
+        """
+        return [sum(1 << x for x, digit in enumerate(row) if digit)
+                for row in struct]
+
+    def bitboard_rows(self):
+        """
+        Get the bit mask of each row of the block, shifted to its
+        x-coordinate as it would be on the bitboard.
+        """
+        return [row_mask << self.x for row_mask in self._rows]
+
+    def grid_cells(self):
+        """
+        Get the grid coordinates of the block's tiles as three arrays:
+        their rows, their columns and their y_offsets in the structure.
+        """
+        y_offsets = self._cells[:, 0]
+        return y_offsets + self.y, self._cells[:, 1] + self.x, y_offsets
+
+    def toggle_footprint(self, bitboard):
+        """
+        Add the block's cells to the bitboard, or remove them if they
+        are already there.
+        """
+        for y_offset, row_mask in enumerate(self._rows):
+            bitboard[self.y + y_offset] ^= row_mask << self.x
+
+    def collides_with(self, bitboard):
+        """
+        Check if any cell of the block overlaps an occupied cell of the
+        bitboard. The block's own cells must not be in the bitboard.
+        """
+        return any(bitboard[self.y + y_offset] & (row_mask << self.x)
+                   for y_offset, row_mask in enumerate(self._rows))
+
     def move(self, dx, dy, group):
         """
         Move the block by the specified increments (dx, dy) and check for collisions.
+        Return whether the block moved.
         """
+        # Lift the block off the board so it doesn't collide with itself.
+        self.toggle_footprint(group.bitboard)
         self.x += dx
         self.y += dy
-        if self._is_collision(group) or self._is_out_of_bounds():
+        blocked = self._is_out_of_bounds() or self._is_collision(group)
+        if blocked:
             self.x -= dx
             self.y -= dy
-            if dy > 0:  # Moving down
-                self.current = False
-                raise BottomReached
+        self.toggle_footprint(group.bitboard)
+        if blocked and dy > 0:  # Moving down
+            self.current = False
+            raise BottomReached
+        return not blocked
 
     def _is_collision(self, group):
         """
         Check if the block collides with another block in the group.
         """
-        return Block.collide(self, group)
+        return self.collides_with(group.bitboard)
 
     def _is_out_of_bounds(self):
         """
         Check if the block is out of bounds.
         """
-        return (self.rect.right > GRID_WIDTH or 
-                self.rect.left < 0 or 
-                self.rect.bottom > GRID_HEIGHT)
+        return self.x < 0 or self.x + self._w > GRID_COLS or self.y + self._h > GRID_ROWS
 
     def rotate(self, group):
         """
         Rotate the block and adjust its position to avoid collisions and stay within bounds.
+        If there is no room for the rotated block, it is left as it was.
         """
-        self.image = pygame.transform.rotate(self.image, 90)
-        self.rect.width = self.image.get_width()
-        self.rect.height = self.image.get_height()
-        self._create_mask()
-        while self._is_out_of_bounds() or self._is_collision(group):
-            if self.rect.right > GRID_WIDTH:
-                self.x -= 1
-            elif self.rect.left < 0:
-                self.x += 1
-            elif self.rect.bottom > GRID_HEIGHT:
-                self.y -= 1
-        self.struct = np.rot90(self.struct)
+        if self._rotation is None:
+            # The structure lost some rows to a completed line.
+            rotation = None
+            struct = np.rot90(self.struct)
+        else:
+            rotation = (self._rotation + 1) % 4
+            struct = _ROTATION_CACHE[(type(self).__name__, self._flip, rotation)]
+        self.toggle_footprint(group.bitboard)
+        kick = find_kick(Block._row_masks(struct), struct.shape[1],
+                         group.bitboard, self.x, self.y)
+        if kick is not None:
+            self.struct = struct
+            self._rotation = rotation
+            self._render()
+            self._update_struct_info()
+            self.rect.width = self.image.get_width()
+            self.rect.height = self.image.get_height()
+            self.x += kick[0]
+            self.y += kick[1]
+        self.toggle_footprint(group.bitboard)
 
     def move_left(self, group):
         """
         Move the block to the left within the group.
         """
-        self.move(-1, 0, group)
+        return self.move(-1, 0, group)
 
     def move_right(self, group):
         """
         Move the block to the right within the group.
         """
-        self.move(1, 0, group)
+        return self.move(1, 0, group)
 
     def move_down(self, group):
         """
         Move the block downward within the group.
         """
-        self.move(0, 1, group)
+        return self.move(0, 1, group)
 
     def update(self):
         """
@@ -288,6 +393,17 @@ class ReverseZBlock(Block):
         (0, 1),
     )
 
+# Structure of each block type for every (flip, rotation), where flip
+# tells whether it's flipped in the X axis and rotation is the number of
+# quarter turns applied after flipping.
+_ROTATION_CACHE = {
+    (block_type.__name__, flip, rotation):
+        np.rot90(np.flip(block_type.struct, 0) if flip else block_type.struct, rotation)
+    for block_type in (SquareBlock, TBlock, LineBlock, LBlock, ZBlock, ReverseLBlock, ReverseZBlock)
+    for flip in (0, 1)
+    for rotation in range(4)
+}
+
 class BlocksGroup(pygame.sprite.OrderedUpdates):
     """
     Class representing a group of blocks in Tetris.
@@ -313,7 +429,8 @@ class BlocksGroup(pygame.sprite.OrderedUpdates):
         self.level = 1
         self.lines_completed = 0
         self.speed = LEVEL_SPEEDS[self.level - 1]
-        pygame.time.set_timer(pygame.USEREVENT + 1, self.speed)
+        self._last_timer_speed = None
+        self._update_timer()
         self._current_block_movement_heading = None
         self._create_new_block()
 
@@ -322,99 +439,113 @@ class BlocksGroup(pygame.sprite.OrderedUpdates):
         Check each line of the grid and remove the ones that
         are complete.
         """
-        # Start checking from the bottom.
-        for i, row in enumerate(self.grid[::-1]):
-            if all(row):
-                self.score += 5
-                # Increment the lines completed counter
-                self.lines_completed += 1
-
-                # Get the blocks affected by the line deletion and
-                # remove duplicates.
-                affected_blocks = list(OrderedDict.fromkeys(self.grid[-1 - i]))
-
-                for block, y_offset in affected_blocks:
-                    # Remove the block tiles which belong to the
-                    # completed line.
-                    block.struct = np.delete(block.struct, y_offset, 0)
-                    if block.struct.any():
-                        # Once removed, check if we have empty columns
-                        # since they need to be dropped.
-                        block.struct, x_offset = del_empty_columns(block.struct)
-                        # Compensate the space gone with the columns to
-                        # keep the block's original position.
-                        block.x += x_offset
-                        # Force update.
-                        block.redraw()
-                    else:
-                        # If the struct is empty then the block is gone.
-                        self.remove(block)
-
-                # Check if enough lines have been completed to change the level
-                if self.lines_completed >= LINES_PER_LEVEL:
-                    self.lines_completed = 0
-                    self.level += 1
-                    self.speed = LEVEL_SPEEDS[self.level - 1]
-                    pygame.time.set_timer(pygame.USEREVENT + 1, self.speed)
-                    print(f"Level {self.level}")
-
-                # Instead of checking which blocks need to be moved
-                # once a line was completed, just try to move all of
-                # them.
-                for block in self:
-                    # Except the current block.
-                    if block.current:
-                        continue
-                    # Pull down each block until it reaches the
-                    # bottom or collides with another block.
-                    while True:
-                        try:
-                            block.move_down(self)
-                        except BottomReached:
-                            break
-
-                self.update_grid()
-                # Since we've updated the grid, now the i counter
-                # is no longer valid, so call the function again
-                # to check if there're other completed lines in the
-                # new grid.
-                self._check_line_completion()
+        while True:
+            rows = np.flatnonzero(self._occ.all(axis=1)).tolist()
+            if not rows:
                 break
+            self.score += 5 * len(rows)
+            # Increment the lines completed counter
+            self.lines_completed += len(rows)
+
+            # Get the blocks affected by the line deletions along with
+            # the offsets of their rows to remove, without duplicates.
+            affected_blocks = {}
+            for rowid in rows:
+                for block, y_offset in {self._owner[(rowid, colid)] for colid in range(GRID_COLS)}:
+                    affected_blocks.setdefault(block, []).append(y_offset)
+
+            for block, y_offsets in affected_blocks.items():
+                # Remove the block tiles which belong to the
+                # completed lines. If none are left the block is gone.
+                if not block.remove_rows(y_offsets):
+                    self.remove(block)
+
+            # Check if enough lines have been completed to change the level
+            if self.lines_completed >= LINES_PER_LEVEL:
+                self.lines_completed -= LINES_PER_LEVEL
+                self.level += 1
+                self.speed = LEVEL_SPEEDS[self.level - 1]
+                self._update_timer()
+                print(f"Level {self.level}")
+
+            self._update_bitboard()
+
+            # Instead of checking which blocks need to be moved
+            # once the lines were completed, just try to move all of
+            # them, except the current block.
+            falling = [block for block in self if not block.current]
+            blocks_rows = [block.bitboard_rows() for block in falling]
+            new_ys = apply_gravity(self.bitboard, blocks_rows, [block.y for block in falling])
+            for block, y in zip(falling, new_ys):
+                block.y = y
+
+            # Pulling the blocks down may have completed other lines,
+            # so check the new grid again.
+            self._rebuild_grid()
 
     def _reset_grid(self):
         """
         Reset the grid to an empty state.
         """
-        self.grid = [[0 for _ in range(10)] for _ in range(20)]
+        self._occ = np.zeros((GRID_ROWS, GRID_COLS), dtype=np.uint8)
+        self._owner = {}
+        self.bitboard = [0] * GRID_ROWS
 
     def _create_new_block(self):
         """
         Create a new block and add it to the group.
         """
         new_block = self.next_block or BlocksGroup.get_random_block()
-        if Block.collide(new_block, self):
+        if new_block.collides_with(self.bitboard):
             raise TopReached
         self.add(new_block)
+        new_block.toggle_footprint(self.bitboard)
         self.next_block = BlocksGroup.get_random_block()
-        self.update_grid()
+        self._rebuild_grid()
         self._check_line_completion()
-        self.speed = LEVEL_SPEEDS[self.level - 1]
-        pygame.time.set_timer(pygame.USEREVENT + 1, self.speed)
 
-    def update_grid(self):
+    def _update_timer(self):
         """
-        Update the grid representation based on the blocks in the group.
+        Set the timer that drops the current block to the current speed,
+        unless it is already running at that speed.
         """
-        self._reset_grid()
+        if self.speed != self._last_timer_speed:
+            pygame.time.set_timer(pygame.USEREVENT + 1, self.speed)
+            self._last_timer_speed = self.speed
+
+    def _rebuild_grid(self):
+        """
+        Rebuild the grid representation from the blocks in the group.
+        The grid is only read when checking for completed lines, so this
+        is called when a block lands or lines are cleared rather than
+        every time the current block moves.
+
+        _occ is a (GRID_ROWS, GRID_COLS) array telling which cells are
+        occupied and _owner maps each occupied (row, column) to the
+        (block, y_offset) it belongs to.
+        """
+        self._occ = np.zeros((GRID_ROWS, GRID_COLS), dtype=np.uint8)
+        self._owner = {}
         for block in self:
-            for y_offset, row in enumerate(block.struct):
-                for x_offset, digit in enumerate(row):
-                    # Prevent replacing previous blocks.
-                    if digit == 0:
-                        continue
-                    rowid = block.y + y_offset
-                    colid = block.x + x_offset
-                    self.grid[rowid][colid] = (block, y_offset)
+            BlocksGroup._place_block(self._occ, self._owner, block)
+
+    @staticmethod
+    def _place_block(occ, owner, block):
+        """
+        Write the cells of the block into the grid.
+        """
+        rowids, colids, y_offsets = block.grid_cells()
+        occ[rowids, colids] = 1
+        for rowid, colid, y_offset in zip(rowids.tolist(), colids.tolist(), y_offsets.tolist()):
+            owner[(rowid, colid)] = (block, y_offset)
+
+    def _update_bitboard(self):
+        """
+        Rebuild the bitboard from the blocks in the group.
+        """
+        self.bitboard = [0] * GRID_ROWS
+        for block in self:
+            block.toggle_footprint(self.bitboard)
 
     @property
     def current_block(self):
@@ -432,25 +563,20 @@ class BlocksGroup(pygame.sprite.OrderedUpdates):
         except BottomReached:
             self.stop_moving_current_block()
             self._create_new_block()
-        else:
-            self.update_grid()
 
     def move_current_block(self):
-        """Move the current block based on the user's input."""
+        """
+        Move the current block based on the user's input.
+        Return whether the block moved or a new block was created.
+        """
         if self._current_block_movement_heading is None:
-            return
-        action = {
-            pygame.K_DOWN: self.current_block.move_down,
-            pygame.K_LEFT: self.current_block.move_left,
-            pygame.K_RIGHT: self.current_block.move_right
-        }
+            return False
         try:
-            action[self._current_block_movement_heading](self)
+            return getattr(self.current_block, MOVE_METHODS[self._current_block_movement_heading])(self)
         except BottomReached:
             self.stop_moving_current_block()
             self._create_new_block()
-        else:
-            self.update_grid()
+            return True
 
     def start_moving_current_block(self, key):
         """Start moving the current block in the specified direction."""
@@ -469,26 +595,62 @@ class BlocksGroup(pygame.sprite.OrderedUpdates):
         """Rotate the current block if it is not a SquareBlock."""
         if not isinstance(self.current_block, SquareBlock):
             self.current_block.rotate(self)
-            self.update_grid()
 
-def del_empty_columns(arr, _x_offset=0, _keep_counting=True):
+def del_empty_columns(arr):
     """
     Remove empty columns from arr (i.e. those filled with zeros).
     The return value is (new_arr, x_offset), where x_offset is how
     much the x coordinate needs to be increased to maintain
     the block's original position.
     """
-    for colid, col in enumerate(arr.T):
-        if col.max() == 0:
-            if _keep_counting:
-                _x_offset += 1
-            # Remove the current column and try again.
-            arr, _x_offset = del_empty_columns(
-                np.delete(arr, colid, 1), _x_offset, _keep_counting)
-            break
-        else:
-            _keep_counting = False
-    return arr, _x_offset
+    nonzero_cols = arr.any(axis=0)
+    # The leading empty columns are the ones before the first non-empty one.
+    x_offset = int(np.argmax(nonzero_cols)) if nonzero_cols.any() else 0
+    return arr[:, nonzero_cols], x_offset
+
+def apply_gravity(bitboard, blocks_rows, blocks_y):
+    """
+    Pull each block down until it reaches the bottom or collides with
+    another block, in the order given. blocks_rows holds the row masks
+    of each block already shifted to its x-coordinate, and blocks_y
+    their y-coordinates. The blocks must be in the bitboard, which is
+    updated as they fall. The return value is the list of new
+    y-coordinates.
+    """
+    new_ys = []
+    for rows, y in zip(blocks_rows, blocks_y):
+        # Lift the block off the board so it doesn't collide with itself.
+        for y_offset, row_mask in enumerate(rows):
+            bitboard[y + y_offset] ^= row_mask
+        while y + len(rows) < GRID_ROWS and not any(bitboard[y + 1 + y_offset] & row_mask
+                                                    for y_offset, row_mask in enumerate(rows)):
+            y += 1
+        for y_offset, row_mask in enumerate(rows):
+            bitboard[y + y_offset] ^= row_mask
+        new_ys.append(y)
+    return new_ys
+
+def find_kick(row_masks, width, bitboard, x, y):
+    """
+    Find where a rotated block fits. row_masks and width describe the
+    rotated structure (see Block._row_masks) and (x, y) is its position.
+    The block is first pushed back inside the grid and then nudged by
+    each of WALL_KICKS in turn. The return value is the (dx, dy) that
+    needs to be applied to the position, or None if the block doesn't
+    fit anywhere.
+    """
+    height = len(row_masks)
+    kick_x = min(max(x, 0), GRID_COLS - width)
+    kick_y = min(y, GRID_ROWS - height)
+    for dx, dy in WALL_KICKS:
+        new_x = kick_x + dx
+        new_y = kick_y + dy
+        if new_x < 0 or new_x + width > GRID_COLS or new_y < 0 or new_y + height > GRID_ROWS:
+            continue
+        if not any(bitboard[new_y + y_offset] & (row_mask << new_x)
+                   for y_offset, row_mask in enumerate(row_masks)):
+            return new_x - x, new_y - y
+    return None
 
 def draw_grid(background):
     """Draw the background grid on the given surface."""
@@ -536,43 +698,77 @@ def main():
     score_msg_text = render_text(font, "Score:", (255, 255, 255), bgcolor)
     game_over_text = render_text(font, "Game over!", (255, 220, 0), bgcolor)
 
-    MOVEMENT_KEYS = pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN
+    # Last rendered score and level, only rendered again when they change.
+    score_cache = {"val": None, "surf": None}
+    level_cache = {"val": None, "surf": None}
+
+    def render_cached_text(cache, font, label, value, bgcolor):
+        """Render the label with its value, reusing the cached surface if the value is the same."""
+        if cache["val"] != value:
+            cache["surf"] = render_text(font, f"{label}: {value}", (255, 255, 255), bgcolor)
+            cache["val"] = value
+        return cache["surf"]
+
+    MOVEMENT_KEYS = frozenset((pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN))
     EVENT_UPDATE_CURRENT_BLOCK = pygame.USEREVENT + 1
     EVENT_MOVE_CURRENT_BLOCK = pygame.USEREVENT + 2
+    EXPOSE_EVENTS = frozenset((pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED))
+    # Only let the events handled by the game into the queue, so it
+    # isn't flooded with mouse motion and the like.
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP,
+                              EVENT_UPDATE_CURRENT_BLOCK, EVENT_MOVE_CURRENT_BLOCK,
+                              *EXPOSE_EVENTS])
     pygame.time.set_timer(EVENT_UPDATE_CURRENT_BLOCK, LEVEL_SPEEDS[0])
     pygame.time.set_timer(EVENT_MOVE_CURRENT_BLOCK, 100)
 
     blocks = BlocksGroup()
 
     def handle_event(event, blocks, game_over, paused):
-        """Handle the various events during the game."""
+        """
+        Handle the various events during the game.
+        Return (run, game_over, paused, dirty), where dirty tells whether
+        the screen needs to be redrawn.
+        """
         if event.type == pygame.QUIT:
-            return False, game_over, paused
+            return False, game_over, paused, False
+        # The window was uncovered or restored, so it needs repainting.
+        if event.type in EXPOSE_EVENTS:
+            return True, game_over, paused, True
 
+        dirty = False
         if event.type == pygame.KEYUP:
-            handle_keyup_event(event, blocks, game_over, paused)
+            paused, dirty = handle_keyup_event(event, blocks, game_over, paused)
         elif event.type == pygame.KEYDOWN and not (game_over or paused):
             handle_keydown_event(event, blocks)
-        elif event.type == pygame.USEREVENT + 1:
-            blocks.update_current_block()
 
-        try:
-            handle_block_events(event, blocks)
-        except TopReached:
-            game_over = True
+        # The blocks stay still while the game is paused or over.
+        if not (game_over or paused):
+            try:
+                if event.type == pygame.USEREVENT + 1:
+                    blocks.update_current_block()
+                    dirty = True
+                dirty = handle_block_events(event, blocks) or dirty
+            except TopReached:
+                game_over = True
+                dirty = True
 
-        return True, game_over, paused
+        return True, game_over, paused, dirty
 
     def handle_keyup_event(event, blocks, game_over, paused):
-        """Handle the KEYUP event during the game."""
+        """Handle the KEYUP event during the game. Return (paused, dirty)."""
+        dirty = False
         if not paused and not game_over:
             if event.key in MOVEMENT_KEYS:
                 blocks.stop_moving_current_block()
             elif event.key == pygame.K_UP:
                 blocks.rotate_current_block()
+                dirty = True
 
         if event.key == pygame.K_p:
             paused = not paused
+            dirty = True
+        return paused, dirty
 
     def handle_keydown_event(event, blocks):
         """Handle the KEYDOWN event during the game."""
@@ -580,11 +776,13 @@ def main():
             blocks.start_moving_current_block(event.key)
 
     def handle_block_events(event, blocks):
-        """Handle events related to the game blocks."""
+        """Handle events related to the game blocks. Return whether a block was updated."""
         if event.type == EVENT_UPDATE_CURRENT_BLOCK:
             blocks.update_current_block()
-        elif event.type == EVENT_MOVE_CURRENT_BLOCK:
-            blocks.move_current_block()
+            return True
+        if event.type == EVENT_MOVE_CURRENT_BLOCK:
+            return blocks.move_current_block()
+        return False
 
     def draw_screen(screen, background, blocks, next_block_text, score_msg_text, game_over_text, font, bgcolor, game_over):
         """Draw the game screen with relevant information."""
@@ -593,21 +791,27 @@ def main():
         draw_centered_surface(screen, next_block_text, 50)
         draw_centered_surface(screen, blocks.next_block.image, 100)
         draw_centered_surface(screen, score_msg_text, 240)
-        score_text = font.render(f"Score: {blocks.score}", True, (255, 255, 255), bgcolor)
+        score_text = render_cached_text(score_cache, font, "Score", blocks.score, bgcolor)
         draw_centered_surface(screen, score_text, 270)
-        level_text = font.render(f"Level: {blocks.level}", True, (255, 255, 255), bgcolor)
+        level_text = render_cached_text(level_cache, font, "Level", blocks.level, bgcolor)
         draw_centered_surface(screen, level_text, 300)
         if game_over:
             draw_centered_surface(screen, game_over_text, 360)
         pygame.display.flip()
 
+    dirty = True
     while run:
         for event in pygame.event.get():
-            run, game_over, paused = handle_event(event, blocks, game_over, paused)
+            run, game_over, paused, event_dirty = handle_event(event, blocks, game_over, paused)
+            dirty = dirty or event_dirty
             if not run:
                 break
-        if run:
+        # Only redraw when something changed since the last frame.
+        if run and dirty:
             draw_screen(screen, background, blocks, next_block_text, score_msg_text, game_over_text, font, bgcolor, game_over)
+            dirty = False
+        # Yield the CPU instead of spinning on an empty event queue.
+        pygame.time.wait(1)
     pygame.quit()
 
 if __name__ == "__main__":